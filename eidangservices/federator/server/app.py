@@ -424,6 +424,10 @@ class FederatorWebserviceTest(FederatorWebserviceBase):
             app = self.setup_app()
 
             # run local Flask WSGI server (not for production)
+            # NOTE(damb): Werkzeug's threaded development server runs a
+            # single process i.e. CPU-bound combining contends on the GIL.
+            # Deploy under mod_wsgi with multi-process daemon workers (see
+            # apache2/federator.{conf,wsgi}) in production.
             self.logger.info('Serving with local WSGI server.')
             app.run(threaded=True, port=self.args.port,
                     debug=(os.environ.get('DEBUG') == 'True'),
@@ -3,12 +3,19 @@
 Miscellaneous utils.
 """
 
+import atexit
+import contextlib
 import enum
 import os
 import importlib
 import logging
+import math
 import random
+import secrets
+import sys
 import tempfile
+import threading
+import time
 import uuid
 
 from redis.exceptions import RedisError
@@ -32,6 +39,434 @@ class KeepTempfiles(enum.Enum):
     NONE = 2
 
 
+class RequestSlot:
+    """
+    Utility implementation of an in-process request slot pool granting up
+    to ``limit`` slots concurrently. Blocking is delegated to
+    :py:class:`threading.BoundedSemaphore` i.e. a single C-level call
+    instead of a Python-level wait loop; a waiter is woken up as soon as
+    a slot is released.
+    """
+
+    def __init__(self, limit=1):
+        self._sem = threading.BoundedSemaphore(limit)
+        self._in_flight = 0
+
+    @property
+    def in_flight(self):
+        # NOTE(damb): A plain int read is atomic under the GIL; for
+        # diagnostic purposes a slightly stale value is accepted in favor
+        # of not serializing against the hot path.
+        return self._in_flight
+
+    def acquire(self, timeout=-1):
+        """
+        Acquire a slot.
+
+        :param float timeout: Maximum time in seconds the call is allowed
+            to block while waiting for a slot. A negative value blocks
+            indefinitely.
+
+        :returns: :code:`True` if a slot was acquired, else
+            :code:`False` in case the timeout passed
+        :rtype: bool
+        """
+        if not self._sem.acquire(timeout=None if timeout < 0 else timeout):
+            return False
+
+        self._in_flight += 1
+        return True
+
+    def release(self, n=1):
+        """
+        Release ``n`` slots and wake up as many waiters.
+
+        :param int n: Number of slots to be released; allows coalescing
+            a burst of completions into a single call
+        """
+        self._in_flight -= n
+        # XXX(damb): Semaphore.release() grows an n parameter only with
+        # Python 3.9.
+        for _ in range(n):
+            self._sem.release()
+
+
+# NOTE(damb): Priming the token list must be performed atomically wrt.
+# concurrently initializing workers. Else, the list would be primed with
+# a multiple of the configured limit.
+_INIT_POOL_LUA = """
+local limit = tonumber(ARGV[1])
+local n = redis.call('LLEN', KEYS[1]) + redis.call('ZCARD', KEYS[2])
+
+for i = n + 1, limit do
+    redis.call('RPUSH', KEYS[1], 1)
+end
+return limit - n
+"""
+
+# NOTE(damb): Removing stale slots and returning the corresponding tokens
+# must be performed atomically. Else, concurrently reaping workers would
+# return more tokens than slots removed.
+_REAP_SLOTS_LUA = """
+local now = tonumber(ARGV[1])
+local stale_ttl = tonumber(ARGV[2])
+local stale = redis.call(
+    'ZRANGEBYSCORE', KEYS[2], '-inf', now - stale_ttl)
+
+if #stale > 0 then
+    redis.call('ZREM', KEYS[2], unpack(stale))
+    for i = 1, #stale do
+        redis.call('RPUSH', KEYS[1], 1)
+    end
+end
+return #stale
+"""
+
+
+class RequestSlotPool:
+    """
+    Pool limiting the number of concurrent requests on a per endpoint URL
+    basis. Slot accounting is shared among federator worker processes by
+    means of Redis: free slots are modelled as tokens within a Redis
+    `list <https://redis.io/topics/data-types>`_ per URL. Acquiring a
+    slot blocks on the Redis server by means of :code:`BLPOP` i.e. a
+    single blocking round trip instead of periodically polling the slot
+    state. Active slots are additionally tracked within a `sorted set
+    <https://redis.io/topics/data-types>`_ per URL (request identifier
+    as member, acquisition timestamp as score) such that slots left
+    behind by crashed workers are garbage collected and the
+    corresponding tokens restored.
+
+    In order to amortize Redis round trips under contention, tokens are
+    cached worker-locally (*sloppy counter*): acquiring prefetches a
+    batch of tokens while releasing returns tokens to the local cache
+    first, flushing the excess back to Redis. Hence, the limit is
+    enforced approximately while a worker holds cached tokens.
+    """
+
+    KEY_PREFIX_FREE = 'slots:free:'
+    KEY_PREFIX_ACTIVE = 'slots:active:'
+    KEY_LIMITS = 'slots:limits'
+
+    DEFAULT_STALE_TTL = 600  # seconds
+    DEFAULT_BATCH_SIZE = 8
+
+    class PoolError(ErrorWithTraceback):
+        """Base pool error ({})."""
+
+    class Timeout(PoolError):
+        """Timed out while acquiring a request slot ({})."""
+
+    def __init__(self, redis, stale_ttl=DEFAULT_STALE_TTL,
+                 batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param redis: Redis client the pool's state is maintained with
+        :param float stale_ttl: Time in seconds after which a slot not
+            released is considered stale and garbage collected
+        :param int batch_size: Number of tokens cached worker-locally
+        """
+        self.redis = redis
+        self._stale_ttl = stale_ttl
+        self._batch_size = batch_size
+        self._limit_map = {}
+        self._local_tokens = {}
+        self._local_locks = {}
+        # frozen per-URL lookup tables (rebuilt on registration)
+        self._url_to_id = {}
+        self._limits = ()
+        self._free_keys = ()
+        self._active_keys = ()
+        # NOTE(damb): Scripts are registered once; redis-py invokes them
+        # by means of EVALSHA falling back to EVAL on NOSCRIPT.
+        self._init_script = self.redis.register_script(_INIT_POOL_LUA)
+        self._reap_script = self.redis.register_script(_REAP_SLOTS_LUA)
+
+        # NOTE(damb): Return cached tokens on worker shutdown; else the
+        # effective limit would shrink until slots are reaped.
+        atexit.register(self.drain)
+
+    def init_pool(self, url, limit):
+        """
+        Register ``url`` with the pool and prime the corresponding token
+        list with ``limit`` tokens.
+
+        :param str url: Endpoint URL the limit is configured for
+        :param int limit: Maximum number of concurrent requests allowed
+        """
+        self._limit_map[url] = limit
+        self._local_tokens.setdefault(url, 0)
+        self._local_locks.setdefault(url, threading.Lock())
+        self._freeze()
+
+        try:
+            with self.redis.pipeline(transaction=False) as p:
+                p.hset(self.KEY_LIMITS, url, limit)
+                self._init_script(
+                    keys=[self._free_key(url), self._active_key(url)],
+                    args=[limit], client=p)
+                p.execute()
+        except RedisError as err:
+            raise self.PoolError(err)
+
+    def acquire(self, url, timeout=-1):
+        """
+        Acquire a request slot for ``url``.
+
+        Blocking is delegated to the Redis server (:code:`BLPOP`);
+        waiting clients are woken up as soon as a token is returned by
+        :py:meth:`release` instead of periodically polling the slot
+        state. While waiting, stale slots are garbage collected.
+
+        :param str url: Endpoint URL a slot is acquired for
+        :param float timeout: Maximum time in seconds the call is allowed
+            to block while waiting for a free slot. A negative value
+            blocks indefinitely.
+
+        :returns: Request identifier to be passed to :py:meth:`release`
+            or :code:`None` in case the timeout passed
+        :rtype: bytes or None
+        """
+        try:
+            url_id = self._url_to_id[url]
+        except KeyError:
+            raise self.PoolError('URL not registered with pool: '
+                                 '{!r}'.format(url))
+
+        req_id = secrets.token_bytes(8)
+        free_key = self._free_keys[url_id]
+        active_key = self._active_keys[url_id]
+
+        # fast path: consume a worker-locally cached token
+        with self._local_locks[url]:
+            if self._local_tokens[url] > 0:
+                self._local_tokens[url] -= 1
+                try:
+                    self.redis.zadd(active_key, {req_id: time.time()})
+                except RedisError as err:
+                    raise self.PoolError(err)
+                return req_id
+
+        # NOTE(damb): Deadlines are computed from the monotonic clock;
+        # wall-clock time is only used for slot accounting shared with
+        # other hosts.
+        deadline = (
+            math.inf if timeout < 0 else time.monotonic() + timeout)
+        backoff = 0.005
+
+        while True:
+            try:
+                self.reap(url)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+
+                # NOTE(damb): Waiting is bounded by the stale TTL such
+                # that slots of crashed workers are reaped while blocked.
+                wait = min(remaining, self._stale_ttl)
+                if wait < 1:
+                    # NOTE(damb): BLPOP timeouts are second-granular;
+                    # for sub-second waits fall back to a non-blocking
+                    # LPOP with exponentially backed-off sleeps keeping
+                    # the rejection-path Redis QPS low.
+                    token = self.redis.lpop(free_key)
+                    if token is None:
+                        time.sleep(
+                            min(backoff,
+                                max(0, deadline - time.monotonic())))
+                        backoff = min(backoff * 2, 0.25)
+                else:
+                    token = self.redis.blpop(free_key, timeout=int(wait))
+            except RedisError as err:
+                raise self.PoolError(err)
+
+            if token is not None:
+                try:
+                    self._prefetch(url)
+                    self.redis.zadd(active_key, {req_id: time.time()})
+                except RedisError as err:
+                    raise self.PoolError(err)
+                return req_id
+
+    @contextlib.contextmanager
+    def slot(self, url, timeout=-1):
+        """
+        Context manager wrapping :py:meth:`acquire` and
+        :py:meth:`release`; guarantees the slot to be released on
+        exception paths and saves callers from branching on the
+        acquisition result.
+
+        :param str url: Endpoint URL a slot is acquired for
+        :param float timeout: Maximum time in seconds the call is allowed
+            to block while waiting for a free slot. A negative value
+            blocks indefinitely.
+
+        :raises RequestSlotPool.Timeout: If no slot was acquired within
+            ``timeout`` seconds
+        """
+        req_id = self.acquire(url, timeout=timeout)
+        if req_id is None:
+            raise self.Timeout(timeout)
+
+        try:
+            yield req_id
+        finally:
+            self.release(url, req_id)
+
+    def release(self, url, req_id):
+        """
+        Release a request slot previously acquired for ``url``. The
+        corresponding token is returned to the worker-local cache;
+        excess tokens are flushed back to Redis waking up blocked
+        waiters.
+
+        :param str url: Endpoint URL the slot was acquired for
+        :param bytes req_id: Request identifier returned by
+            :py:meth:`acquire`
+        """
+        self.release_many(url, [req_id])
+
+    def release_many(self, url, req_ids):
+        """
+        Release several request slots previously acquired for ``url``
+        at once. Compared to calling :py:meth:`release` per slot a burst
+        of completions is coalesced into a single pipelined round trip
+        and at most a single multi-token flush.
+
+        :param str url: Endpoint URL the slots were acquired for
+        :param req_ids: Request identifiers returned by
+            :py:meth:`acquire`
+        :type req_ids: list of bytes
+        """
+        url_id = self._url_to_id[url]
+
+        try:
+            with self.redis.pipeline(transaction=False) as p:
+                for req_id in req_ids:
+                    p.zrem(self._active_keys[url_id], req_id)
+                removed = sum(p.execute())
+
+            if not removed:
+                return
+
+            with self._local_locks[url]:
+                self._local_tokens[url] += removed
+                excess = self._local_tokens[url] - self._batch_size
+                if excess > 0:
+                    self._local_tokens[url] -= excess
+                    self.redis.rpush(
+                        self._free_keys[url_id], *([1] * excess))
+        except RedisError as err:
+            raise self.PoolError(err)
+
+    def drain(self, url=None):
+        """
+        Return worker-locally cached tokens to Redis.
+
+        :param url: Endpoint URL to be drained. If :code:`None` all
+            registered URLs are drained.
+        :type url: str or None
+        """
+        urls = [url] if url is not None else list(self._local_tokens)
+        for url in urls:
+            with self._local_locks[url]:
+                n = self._local_tokens[url]
+                if n:
+                    self._local_tokens[url] = 0
+                    try:
+                        self.redis.rpush(self._free_key(url), *([1] * n))
+                    except RedisError as err:
+                        raise self.PoolError(err)
+
+    def in_flight(self, url):
+        """
+        Number of currently acquired slots for ``url``.
+
+        :param str url: Endpoint URL
+
+        :rtype: int
+        """
+        try:
+            return self.redis.zcard(
+                self._active_keys[self._url_to_id[url]])
+        except RedisError as err:
+            raise self.PoolError(err)
+
+    def cached_tokens(self, url):
+        """
+        Number of tokens currently cached worker-locally for ``url``.
+
+        :param str url: Endpoint URL
+
+        :rtype: int
+        """
+        # NOTE(damb): A plain int read is atomic under the GIL; for
+        # diagnostic purposes a slightly stale value is accepted in favor
+        # of not contending the local token lock.
+        return self._local_tokens[url]
+
+    def reap(self, url):
+        """
+        Garbage collect stale slots for ``url`` and restore the
+        corresponding tokens.
+
+        :param str url: Endpoint URL to be garbage collected
+
+        :returns: Number of slots garbage collected
+        :rtype: int
+        """
+        url_id = self._url_to_id[url]
+
+        try:
+            return self._reap_script(
+                keys=[self._free_keys[url_id], self._active_keys[url_id]],
+                args=[time.time(), self._stale_ttl])
+        except RedisError as err:
+            raise self.PoolError(err)
+
+    def _freeze(self):
+        # NOTE(damb): Registration exclusively happens at startup;
+        # specialize the per-URL state into frozen lookup tables such
+        # that the hot path performs a single dict lookup on an interned
+        # string followed by integer indexing.
+        self._url_to_id = {
+            sys.intern(url): i for i, url in enumerate(self._limit_map)}
+        self._limits = tuple(
+            self._limit_map[url] for url in self._url_to_id)
+        self._free_keys = tuple(
+            self._free_key(url) for url in self._url_to_id)
+        self._active_keys = tuple(
+            self._active_key(url) for url in self._url_to_id)
+
+    def _prefetch(self, url):
+        # NOTE(damb): Pull a batch of additional free tokens into the
+        # worker-local cache with a single round trip, amortizing
+        # subsequent acquires.
+        free_key = self._free_keys[self._url_to_id[url]]
+
+        with self._local_locks[url]:
+            n = self._batch_size - 1 - self._local_tokens[url]
+            if n <= 0:
+                return
+
+            with self.redis.pipeline(transaction=False) as p:
+                for _ in range(n):
+                    p.lpop(free_key)
+                fetched = sum(1 for t in p.execute() if t is not None)
+
+            self._local_tokens[url] += fetched
+
+    def _free_key(self, url):
+        if isinstance(url, bytes):
+            url = url.decode('utf-8')
+        return self.KEY_PREFIX_FREE + url
+
+    def _active_key(self, url):
+        if isinstance(url, bytes):
+            url = url.decode('utf-8')
+        return self.KEY_PREFIX_ACTIVE + url
+
+
 class Context:
     """
     Utility implementation of a simple hierarchical request context. Request
@@ -12,6 +12,8 @@ class ClientRetryBudgetMixin:
     Adds the :py:attr:`stats_retry_budget_client` property to a object.
     """
 
+    __slots__ = ()
+
     @property
     def stats_retry_budget_client(self):
         return response_code_stats
@@ -56,6 +58,8 @@ class CachingMixin:
     :py:class:`~eidangservices.federator.server.process.RequestProcessor`.
     """
 
+    __slots__ = ()
+
     @property
     def cache(self):
         return cache
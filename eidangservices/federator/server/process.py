@@ -7,7 +7,7 @@ import datetime
 import logging
 import multiprocessing as mp
 import os
-import time
+import queue
 import uuid
 
 from flask import current_app, stream_with_context, Response
@@ -23,7 +23,7 @@ from eidangservices.federator.server.strategy import (  # noqa
     GranularRequestStrategy, NetworkBulkRequestStrategy,
     NetworkCombiningRequestStrategy, AdaptiveNetworkBulkRequestStrategy)
 from eidangservices.federator.server.task import (
-    RawDownloadTask, RawSplitAndAlignTask, StationTextDownloadTask,
+    RawDownloadTask, RawSplitAndAlignTask, Result, StationTextDownloadTask,
     StationXMLDownloadTask, StationXMLNetworkCombinerTask,
     WFCatalogSplitAndAlignTask)
 from eidangservices.utils.error import ErrorWithTraceback
@@ -53,12 +53,36 @@ class StreamingError(RequestProcessorError):
     """Error while streaming ({})."""
 
 
+def generate_chunks(fd, chunk_size):
+    """
+    Generator chunk-wise reading from ``fd``.
+
+    :param fd: File-like object to read from
+    :param int chunk_size: Chunk size in bytes
+    """
+    while True:
+        data = fd.read(chunk_size)
+        if not data:
+            break
+        yield data
+
+
 # -----------------------------------------------------------------------------
 class RequestProcessor(ClientRetryBudgetMixin):
     """
     Abstract base class for request processors.
     """
 
+    # NOTE(damb): Processors are instantiated per HTTP request; slot
+    # descriptors keep them compact and avoid __dict__ probes within the
+    # streaming hot loop.
+    __slots__ = ('mimetype', 'content_type', 'query_params', 'stream_epochs',
+                 '_routing_service', '_logger', '_ctx', 'logger',
+                 '_keep_tempfiles', '_retry_budget_client', '_num_routes',
+                 '_pool', '_completion_queue', '_outstanding', '_sizes',
+                 '_default_endtime', '_request_start', '_nodata', '_strategy',
+                 '_http_method', '_num_threads', '_proxy_netloc', '_post')
+
     LOGGER = "flask.app.federator.request_processor"
 
     _STRATEGY_MAP = {
@@ -125,10 +149,17 @@ class RequestProcessor(ClientRetryBudgetMixin):
 
         self._num_routes = 0
         self._pool = None
-        self._results = []
+        # NOTE(damb): Completed tasks hand their results over to the
+        # processor by means of a completion queue i.e. instead of
+        # periodically polling the AsyncResult objects.
+        self._completion_queue = queue.Queue()
+        self._outstanding = 0
         self._sizes = []
 
         self._default_endtime = datetime.datetime.utcnow()
+        # NOTE(damb): Reference point for per-request timeout computation;
+        # deliberately decoupled from the stream epoch default endtime.
+        self._request_start = datetime.datetime.utcnow()
 
         self._nodata = int(self.query_params.get(
             'nodata', settings.FDSN_DEFAULT_NO_CONTENT_ERROR_CODE))
@@ -252,6 +283,19 @@ class RequestProcessor(ClientRetryBudgetMixin):
     def _handle_teapot(self, result):
         self.logger.debug('Teapot: {}'.format(result))
 
+    def _on_task_error(self, err):
+        """
+        Error callback invoked with an exception escaping a task.
+
+        Enqueues a synthetic error result such that the completion
+        accounting keeps on draining i.e. the processor does not stall
+        until the streaming timeout is exceeded.
+        """
+        self.logger.error('Task raised unexpectedly: {}'.format(err))
+        self._completion_queue.put(
+            Result.error(status='TaskError', status_code=500,
+                         data=str(err)))
+
     def _wait(self, timeout=None):
         """
         Wait for a valid endpoint response.
@@ -261,42 +305,52 @@ class RequestProcessor(ClientRetryBudgetMixin):
         if timeout is None:
             timeout = self.TIMEOUT_STREAMING
 
-        result_with_data = False
         while True:
-            ready = []
-            for result in self._results:
-                if result.ready():
-                    _result = result.get()
-                    if _result.status_code == 200:
-                        result_with_data = True
-                        break
-                    elif _result.status_code == 413:
-                        self._handle_413(_result)
-                        ready.append(result)
-                    else:
-                        self._handle_error(_result)
-                        self._sizes.append(0)
-                        ready.append(result)
+            if not self._outstanding:
+                self.logger.warning(
+                    'No valid results to be federated. (No valid results.)')
+                raise FDSNHTTPError.create(self._nodata)
 
-                # NOTE(damb): We have to handle responses > 5MB. Blocking the
-                # processor by means of time.sleep makes executing
-                # *DownloadTasks IO bound.
-                time.sleep(0.01)
+            remaining = (
+                self._request_start + datetime.timedelta(seconds=timeout) -
+                datetime.datetime.utcnow()).total_seconds()
 
-            for result in ready:
-                self._results.remove(result)
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                _result = self._completion_queue.get(timeout=remaining)
+            except queue.Empty:
+                self.logger.warning(
+                    'No valid results to be federated. '
+                    '(Timeout ({}).)'.format(timeout))
+                raise FDSNHTTPError.create(self._nodata)
 
-            if result_with_data:
+            if _result.status_code == 200:
+                # NOTE(damb): Hand the result back over to the streaming
+                # iterator.
+                self._completion_queue.put(_result)
                 break
+            elif _result.status_code == 413:
+                self._outstanding -= 1
+                self._handle_413(_result)
+            else:
+                self._outstanding -= 1
+                self._handle_error(_result)
+                self._sizes.append(0)
 
-            if (not self._results or datetime.datetime.utcnow() >
-                self.DEFAULT_ENDTIME +
-                    datetime.timedelta(seconds=timeout)):
-                self.logger.warning(
-                    'No valid results to be federated. ({})'.format(
-                        ('No valid results.' if not self._results else
-                         'Timeout ({}).'.format(timeout))))
-                raise FDSNHTTPError.create(self._nodata)
+    def _iter_completed(self):
+        """
+        Generator yielding task results in completion order.
+
+        Provides the completion loop shared by the concrete processors'
+        :py:meth:`__iter__` implementations.
+        """
+        # TODO(damb): Implement a timeout solution in case results are
+        # never ready.
+        while self._outstanding:
+            _result = self._completion_queue.get()
+            self._outstanding -= 1
+            yield _result
 
     def _terminate(self):
         """
@@ -314,13 +368,15 @@ class RequestProcessor(ClientRetryBudgetMixin):
 
         if (self._keep_tempfiles not in (KeepTempfiles.ALL,
                                          KeepTempfiles.ON_ERRORS)):
-            for result in self._results:
-                if result.ready():
-                    _result = result.get()
-                    try:
-                        os.remove(_result.data)
-                    except (TypeError, OSError):
-                        pass
+            while True:
+                try:
+                    _result = self._completion_queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    os.remove(_result.data)
+                except (TypeError, OSError):
+                    pass
 
         self._pool = None
 
@@ -367,12 +423,14 @@ class RawRequestProcessor(RequestProcessor):
     downloading process and the merging afterwards.
     """
 
+    __slots__ = ()
+
     LOGGER = "flask.app.federator.request_processor_raw"
 
     ALLOWED_STRATEGIES = ('granular', 'bulk')
     DEFAULT_DEFAULT_REQUEST_STRATEGY = 'granular'
 
-    CHUNK_SIZE = 1024
+    CHUNK_SIZE = 65536
 
     def _request(self):
         """
@@ -389,12 +447,14 @@ class RawRequestProcessor(RequestProcessor):
         # However, using this parameter seems to lead to processes unexpectedly
         # terminated. Hence some tasks never return a *ready* result.
 
-        self._results = self._strategy.request(
+        self._outstanding = len(self._strategy.request(
             self._pool, tasks={'default': RawDownloadTask},
             query_params=self.query_params,
             keep_tempfiles=self._keep_tempfiles,
             http_method=self._http_method,
-            retry_budget_client=self._retry_budget_client)
+            retry_budget_client=self._retry_budget_client,
+            callback=self._completion_queue.put,
+            error_callback=self._on_task_error))
 
     def _handle_413(self, result):
         self.logger.info(
@@ -415,8 +475,9 @@ class RawRequestProcessor(RequestProcessor):
             context=ctx,
             keep_tempfiles=self._keep_tempfiles)
 
-        result = self._pool.apply_async(t)
-        self._results.append(result)
+        self._pool.apply_async(t, callback=self._completion_queue.put,
+                               error_callback=self._on_task_error)
+        self._outstanding += 1
 
     def __iter__(self):
         """
@@ -425,65 +486,36 @@ class RawRequestProcessor(RequestProcessor):
         # TODO(damb): The processor has to write metadata to the log database.
         # Also in case of errors.
 
-        def generate_chunks(fd, chunk_size=self.CHUNK_SIZE):
-            while True:
-                data = fd.read(chunk_size)
-                if not data:
-                    break
-                yield data
-
         try:
-            while True:
+            for _result in self._iter_completed():
+                if _result.status_code == 200:
+                    self._sizes.append(_result.length)
+                    self.logger.debug(
+                        'Streaming from file {!r} (chunk_size={}).'.
+                        format(_result.data, self.CHUNK_SIZE))
+                    try:
+                        with open(_result.data, 'rb') as fd:
+                            for chunk in generate_chunks(fd, self.CHUNK_SIZE):
+                                yield chunk
+                    except Exception as err:
+                        raise StreamingError(err)
+
+                    if self._keep_tempfiles != KeepTempfiles.ALL:
+                        self.logger.debug(
+                            'Removing temporary file {!r} ...'.format(
+                                _result.data))
+                        try:
+                            os.remove(_result.data)
+                        except OSError as err:
+                            RequestProcessorError(err)
 
-                ready = []
-                for result in self._results:
-
-                    if result.ready():
-                        _result = result.get()
-
-                        if _result.status_code == 200:
-                            self._sizes.append(_result.length)
-                            self.logger.debug(
-                                'Streaming from file {!r} (chunk_size={}).'.
-                                format(_result.data, self.CHUNK_SIZE))
-                            try:
-                                with open(_result.data, 'rb') as fd:
-                                    for chunk in generate_chunks(fd):
-                                        yield chunk
-                            except Exception as err:
-                                raise StreamingError(err)
-
-                            if self._keep_tempfiles != KeepTempfiles.ALL:
-                                self.logger.debug(
-                                    'Removing temporary file {!r} ...'.format(
-                                        _result.data))
-                                try:
-                                    os.remove(_result.data)
-                                except OSError as err:
-                                    RequestProcessorError(err)
-
-                        elif _result.status_code == 413:
-                            # Check if file has to be removed
-                            self._handle_413(_result)
-
-                        else:
-                            self._handle_error(_result)
-                            self._sizes.append(0)
-
-                        ready.append(result)
-
-                    # NOTE(damb): We have to handle responses > 5MB. Blocking
-                    # the processor by means of time.sleep makes executing
-                    # *DownloadTasks* IO bound.
-                    time.sleep(0.01)
-
-                # TODO(damb): Implement a timeout solution in case results are
-                # never ready.
-                for result in ready:
-                    self._results.remove(result)
-
-                if not self._results:
-                    break
+                elif _result.status_code == 413:
+                    # Check if file has to be removed
+                    self._handle_413(_result)
+
+                else:
+                    self._handle_error(_result)
+                    self._sizes.append(0)
 
             self._pool.close()
             self._pool.join()
@@ -501,6 +533,8 @@ class StationRequestProcessor(RequestProcessor, CachingMixin):
     Base class for federating fdsnws-station request processors.
     """
 
+    __slots__ = ()
+
     LOGGER = "flask.app.federator.request_processor_station"
 
     ACCESS = 'any'
@@ -547,7 +581,9 @@ class StationXMLRequestProcessor(StationRequestProcessor):
     wrapped into corresponding StationXML headers.
     """
 
-    CHUNK_SIZE = 1024
+    __slots__ = ()
+
+    CHUNK_SIZE = 65536
 
     ALLOWED_STRATEGIES = ('combining', 'adaptive-bulk')
     DEFAULT_REQUEST_STRATEGY = 'combining'
@@ -559,6 +595,9 @@ class StationXMLRequestProcessor(StationRequestProcessor):
               '<Source>{}</Source>'
               '<Created>{}</Created>')
     FOOTER = '</FDSNStationXML>'
+    # byte overhead of the StationXML wrapper excluding the formatted
+    # creation time (-4 accounts for the two format placeholders)
+    _HEADER_OVERHEAD = len(HEADER) - 4 + len(SOURCE) + len(FOOTER)
 
     TIMEOUT_SHUTDOWN = settings.EIDA_FEDERATOR_SHUTDOWN_TIMEOUT
 
@@ -591,33 +630,26 @@ class StationXMLRequestProcessor(StationRequestProcessor):
                                          KeepTempfiles.ON_ERRORS)):
             self.logger.debug(
                 'Waiting for tasks (allowing them a graceful shutdown) ...')
-            now = datetime.datetime.utcnow()
-            while True:
-                ready = []
-                for result in self._results:
-                    if result.ready():
-
-                        _result = result.get()
-                        try:
-                            os.remove(_result.data)
-                        except (TypeError, OSError):
-                            pass
-
-                        ready.append(result)
-
-                for result in ready:
-                    self._results.remove(result)
-
-                if not self._results:
-                    break
-
-                if (datetime.datetime.utcnow() > now +
-                        datetime.timedelta(seconds=self.TIMEOUT_SHUTDOWN)):
+            deadline = (datetime.datetime.utcnow() +
+                        datetime.timedelta(seconds=self.TIMEOUT_SHUTDOWN))
+            while self._outstanding:
+                remaining = (
+                    deadline - datetime.datetime.utcnow()).total_seconds()
+
+                try:
+                    if remaining <= 0:
+                        raise queue.Empty
+                    _result = self._completion_queue.get(timeout=remaining)
+                except queue.Empty:
                     self.logger.warning('Timeout. Forced shutdown. '
                                         'Temporary files might remain.')
                     break
 
-                time.sleep(0.1)
+                self._outstanding -= 1
+                try:
+                    os.remove(_result.data)
+                except (TypeError, OSError):
+                    pass
 
         self.logger.debug('Terminate ...')
 
@@ -633,14 +665,16 @@ class StationXMLRequestProcessor(StationRequestProcessor):
         self.logger.debug('Init worker pool (size={}).'.format(pool_size))
         self._pool = mp.pool.Pool(processes=pool_size)
 
-        self._results = self._strategy.request(
+        self._outstanding = len(self._strategy.request(
             self._pool, tasks={'default': StationXMLDownloadTask,
                                'combining': StationXMLNetworkCombinerTask},
             query_params=self.query_params,
             keep_tempfiles=self._keep_tempfiles,
             http_method=self._http_method,
             pool_size=self.POOL_SIZE,
-            retry_budget_client=self._retry_budget_client)
+            retry_budget_client=self._retry_budget_client,
+            callback=self._completion_queue.put,
+            error_callback=self._on_task_error))
 
         self._pool.close()
 
@@ -648,66 +682,44 @@ class StationXMLRequestProcessor(StationRequestProcessor):
         """
         Make the processor *streamable*.
         """
-        def generate_chunks(fd, chunk_size=self.CHUNK_SIZE):
-            while True:
-                data = fd.read(chunk_size)
-                if not data:
-                    break
-                yield data
+        created = datetime.datetime.utcnow().isoformat()
 
         try:
-            while True:
-                ready = []
-                for result in self._results:
-                    if result.ready():
-
-                        _result = result.get()
-                        if _result.status_code == 200:
-                            if not sum(self._sizes):
-                                yield self.HEADER.format(
-                                    self.SOURCE,
-                                    datetime.datetime.utcnow().isoformat())
-
-                            self._sizes.append(_result.length)
-                            self.logger.debug(
-                                'Streaming from file {!r} (chunk_size={}).'.
-                                format(_result.data, self.CHUNK_SIZE))
-                            try:
-                                with open(_result.data, 'r',
-                                          encoding='utf-8') as fd:
-                                    for chunk in generate_chunks(fd):
-                                        yield chunk
-                            except Exception as err:
-                                raise StreamingError(err)
-
-                            if self._keep_tempfiles != KeepTempfiles.ALL:
-                                self.logger.debug(
-                                    'Removing temporary file {!r} ...'.format(
-                                        _result.data))
-                                try:
-                                    os.remove(_result.data)
-                                except OSError as err:
-                                    RequestProcessorError(err)
-
-                        elif _result.status_code == 413:
-                            self._handle_413(_result)
-
-                        elif _result.status_code == 418:
-                            self._handle_teapot(_result)
-
-                        else:
-                            self._handle_error(_result)
-                            self._sizes.append(0)
-
-                        ready.append(result)
-
-                # TODO(damb): Implement a timeout solution in case results are
-                # never ready.
-                for result in ready:
-                    self._results.remove(result)
-
-                if not self._results:
-                    break
+            for _result in self._iter_completed():
+                if _result.status_code == 200:
+                    if not sum(self._sizes):
+                        yield self.HEADER.format(self.SOURCE, created)
+
+                    self._sizes.append(_result.length)
+                    self.logger.debug(
+                        'Streaming from file {!r} (chunk_size={}).'.
+                        format(_result.data, self.CHUNK_SIZE))
+                    try:
+                        with open(_result.data, 'r',
+                                  encoding='utf-8') as fd:
+                            for chunk in generate_chunks(fd, self.CHUNK_SIZE):
+                                yield chunk
+                    except Exception as err:
+                        raise StreamingError(err)
+
+                    if self._keep_tempfiles != KeepTempfiles.ALL:
+                        self.logger.debug(
+                            'Removing temporary file {!r} ...'.format(
+                                _result.data))
+                        try:
+                            os.remove(_result.data)
+                        except OSError as err:
+                            RequestProcessorError(err)
+
+                elif _result.status_code == 413:
+                    self._handle_413(_result)
+
+                elif _result.status_code == 418:
+                    self._handle_teapot(_result)
+
+                else:
+                    self._handle_error(_result)
+                    self._sizes.append(0)
 
             yield self.FOOTER
 
@@ -715,10 +727,7 @@ class StationXMLRequestProcessor(StationRequestProcessor):
             self.logger.debug('Result sizes: {}.'.format(self._sizes))
             self.logger.info(
                 'Results successfully processed (Total bytes: {}).'.format(
-                    sum(self._sizes) + len(self.HEADER) - 4 +
-                    len(self.SOURCE) +
-                    len(datetime.datetime.utcnow().isoformat()) +
-                    len(self.FOOTER)))
+                    sum(self._sizes) + self._HEADER_OVERHEAD + len(created)))
 
         except GeneratorExit:
             self.logger.debug('GeneratorExit: Propagating close event ...')
@@ -730,9 +739,13 @@ class StationTextRequestProcessor(StationRequestProcessor):
     This processor implements fdsnws-station format=text data federation.
     """
 
+    __slots__ = ('_level', )
+
     ALLOWED_STRATEGIES = ('granular', 'bulk')
     DEFAULT_REQUEST_STRATEGY = 'bulk'
 
+    CHUNK_SIZE = 65536
+
     HEADER_NETWORK = '#Network|Description|StartTime|EndTime|TotalStations'
     HEADER_STATION = (
         '#Network|Station|Latitude|Longitude|'
@@ -760,12 +773,14 @@ class StationTextRequestProcessor(StationRequestProcessor):
         self.logger.debug('Init worker pool (size={}).'.format(pool_size))
         self._pool = mp.pool.ThreadPool(processes=pool_size)
 
-        self._results = self._strategy.request(
+        self._outstanding = len(self._strategy.request(
             self._pool, tasks={'default': StationTextDownloadTask},
             query_params=self.query_params,
             keep_tempfiles=self._keep_tempfiles,
             http_method=self._http_method,
-            retry_budget_client=self._retry_budget_client)
+            retry_budget_client=self._retry_budget_client,
+            callback=self._completion_queue.put,
+            error_callback=self._on_task_error))
 
         self._pool.close()
 
@@ -774,59 +789,54 @@ class StationTextRequestProcessor(StationRequestProcessor):
         Make the processor *streamable*.
         """
         try:
-            while True:
-                ready = []
-                for result in self._results:
-                    if result.ready():
-
-                        _result = result.get()
-                        if _result.status_code == 200:
-                            if not sum(self._sizes):
-                                # add header
-                                if self._level == 'network':
-                                    yield '{}\n'.format(self.HEADER_NETWORK)
-                                elif self._level == 'station':
-                                    yield '{}\n'.format(self.HEADER_STATION)
-                                elif self._level == 'channel':
-                                    yield '{}\n'.format(self.HEADER_CHANNEL)
-
-                            self._sizes.append(_result.length)
-                            self.logger.debug(
-                                'Streaming from file {!r}.'.format(
-                                    _result.data))
-                            try:
-                                with open(_result.data, 'r',
-                                          encoding='utf-8') as fd:
-                                    for line in fd:
-                                        yield line
-                            except Exception as err:
-                                raise StreamingError(err)
-
-                            if self._keep_tempfiles != KeepTempfiles.ALL:
-                                self.logger.debug(
-                                    'Removing temporary file {!r} ...'.format(
-                                        _result.data))
-                                try:
-                                    os.remove(_result.data)
-                                except OSError as err:
-                                    RequestProcessorError(err)
-
-                        elif _result.status_code == 413:
-                            self._handle_413(_result)
-
-                        else:
-                            self._handle_error(_result)
-                            self._sizes.append(0)
-
-                        ready.append(result)
-
-                # TODO(damb): Implement a timeout solution in case results are
-                # never ready.
-                for result in ready:
-                    self._results.remove(result)
-
-                if not self._results:
-                    break
+            for _result in self._iter_completed():
+                if _result.status_code == 200:
+                    # NOTE(damb): The header is batched into the first
+                    # chunk streamed instead of crossing the WSGI
+                    # boundary on its own.
+                    header = ''
+                    if not sum(self._sizes):
+                        if self._level == 'network':
+                            header = '{}\n'.format(self.HEADER_NETWORK)
+                        elif self._level == 'station':
+                            header = '{}\n'.format(self.HEADER_STATION)
+                        elif self._level == 'channel':
+                            header = '{}\n'.format(self.HEADER_CHANNEL)
+
+                    self._sizes.append(_result.length)
+                    self.logger.debug(
+                        'Streaming from file {!r}.'.format(
+                            _result.data))
+                    try:
+                        with open(_result.data, 'r',
+                                  encoding='utf-8') as fd:
+                            for chunk in generate_chunks(
+                                    fd, self.CHUNK_SIZE):
+                                if header:
+                                    chunk = header + chunk
+                                    header = ''
+                                yield chunk
+                    except Exception as err:
+                        raise StreamingError(err)
+
+                    if header:
+                        yield header
+
+                    if self._keep_tempfiles != KeepTempfiles.ALL:
+                        self.logger.debug(
+                            'Removing temporary file {!r} ...'.format(
+                                _result.data))
+                        try:
+                            os.remove(_result.data)
+                        except OSError as err:
+                            RequestProcessorError(err)
+
+                elif _result.status_code == 413:
+                    self._handle_413(_result)
+
+                else:
+                    self._handle_error(_result)
+                    self._sizes.append(0)
 
             self._pool.join()
             self.logger.debug('Result sizes: {}.'.format(self._sizes))
@@ -844,6 +854,8 @@ class WFCatalogRequestProcessor(RequestProcessor):
     Process a WFCatalog request.
     """
 
+    __slots__ = ()
+
     LOGGER = "flask.app.federator.request_processor_wfcatalog"
 
     ALLOWED_STRATEGIES = ('granular', 'bulk')
@@ -851,7 +863,7 @@ class WFCatalogRequestProcessor(RequestProcessor):
 
     ACCESS = 'any'
 
-    CHUNK_SIZE = 1024
+    CHUNK_SIZE = 65536
 
     JSON_LIST_START = '['
     JSON_LIST_END = ']'
@@ -873,12 +885,14 @@ class WFCatalogRequestProcessor(RequestProcessor):
         # However, using this parameter seems to lead to processes unexpectedly
         # terminated. Hence some tasks never return a *ready* result.
 
-        self._results = self._strategy.request(
+        self._outstanding = len(self._strategy.request(
             self._pool, tasks={'default': RawDownloadTask},
             query_params=self.query_params,
             keep_tempfiles=self._keep_tempfiles,
             http_method=self._http_method,
-            retry_budget_client=self._retry_budget_client)
+            retry_budget_client=self._retry_budget_client,
+            callback=self._completion_queue.put,
+            error_callback=self._on_task_error))
 
     def _handle_413(self, result):
         self.logger.info(
@@ -899,89 +913,70 @@ class WFCatalogRequestProcessor(RequestProcessor):
             context=ctx,
             keep_tempfiles=self._keep_tempfiles,)
 
-        result = self._pool.apply_async(t)
-        self._results.append(result)
+        self._pool.apply_async(t, callback=self._completion_queue.put,
+                               error_callback=self._on_task_error)
+        self._outstanding += 1
 
     def __iter__(self):
         """
         Make the processor *streamable*.
         """
         def generate_chunks(fd, chunk_size=self.CHUNK_SIZE):
-            _size = os.fstat(fd.fileno()).st_size
-            # skip leading bracket (from JSON list)
+            # NOTE(damb): Strip the leading and trailing brackets (from
+            # the JSON list) by bounding the bytes to be read up front;
+            # no tell()/fstat() round trips per chunk.
+            remaining = os.fstat(fd.fileno()).st_size - 2
             fd.seek(1)
-            while True:
-                buf = fd.read(chunk_size)
+            while remaining > 0:
+                buf = fd.read(min(chunk_size, remaining))
                 if not buf:
                     break
 
-                if fd.tell() == _size:
-                    # skip trailing bracket (from JSON list)
-                    buf = buf[:-1]
-
+                remaining -= len(buf)
                 yield buf
 
         try:
-            while True:
-                ready = []
-                for result in self._results:
-                    if result.ready():
-                        _result = result.get()
-                        if _result.status_code == 200:
-                            if not sum(self._sizes):
-                                # add header
-                                yield self.JSON_LIST_START
-                            else:
-                                # prepend comma if not first stream epoch data
-                                yield self.JSON_LIST_SEP
-
-                            self.logger.debug(
-                                'Streaming from file {!r} (chunk_size={}).'.
-                                format(_result.data, self.CHUNK_SIZE))
-                            try:
-                                with open(_result.data, 'rb') as fd:
-                                    # skip leading bracket (from JSON list)
-                                    size = 0
-                                    for chunk in generate_chunks(
-                                            fd, self.CHUNK_SIZE):
-                                        size += len(chunk)
-                                        yield chunk
-
-                                self._sizes.append(size)
-
-                            except Exception as err:
-                                raise StreamingError(err)
-
-                            if self._keep_tempfiles != KeepTempfiles.ALL:
-                                self.logger.debug(
-                                    'Removing temporary file {!r} ...'.format(
-                                        _result.data))
-                                try:
-                                    os.remove(_result.data)
-                                except OSError as err:
-                                    RequestProcessorError(err)
-
-                        elif _result.status_code == 413:
-                            self._handle_413(_result)
-
-                        else:
-                            self._handle_error(_result)
-                            self._sizes.append(0)
-
-                        ready.append(result)
-
-                    # NOTE(damb): We have to handle responses > 5MB. Blocking
-                    # the processor by means of time.sleep makes executing
-                    # DownloadTasks IO bound.
-                    time.sleep(0.01)
-
-                # TODO(damb): Implement a timeout solution in case results are
-                # never ready.
-                for result in ready:
-                    self._results.remove(result)
-
-                if not self._results:
-                    break
+            for _result in self._iter_completed():
+                if _result.status_code == 200:
+                    if not sum(self._sizes):
+                        # add header
+                        yield self.JSON_LIST_START
+                    else:
+                        # prepend comma if not first stream epoch data
+                        yield self.JSON_LIST_SEP
+
+                    self.logger.debug(
+                        'Streaming from file {!r} (chunk_size={}).'.
+                        format(_result.data, self.CHUNK_SIZE))
+                    try:
+                        with open(_result.data, 'rb') as fd:
+                            # skip leading bracket (from JSON list)
+                            size = 0
+                            for chunk in generate_chunks(
+                                    fd, self.CHUNK_SIZE):
+                                size += len(chunk)
+                                yield chunk
+
+                        self._sizes.append(size)
+
+                    except Exception as err:
+                        raise StreamingError(err)
+
+                    if self._keep_tempfiles != KeepTempfiles.ALL:
+                        self.logger.debug(
+                            'Removing temporary file {!r} ...'.format(
+                                _result.data))
+                        try:
+                            os.remove(_result.data)
+                        except OSError as err:
+                            RequestProcessorError(err)
+
+                elif _result.status_code == 413:
+                    self._handle_413(_result)
+
+                else:
+                    self._handle_error(_result)
+                    self._sizes.append(0)
 
             yield self.JSON_LIST_END
 
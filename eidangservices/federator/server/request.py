@@ -4,23 +4,71 @@ EIDA federator request handling facilities
 """
 
 import functools
+import os
+import threading
 
 from collections import OrderedDict
-from copy import deepcopy
+from itertools import chain
 from urllib.parse import urlparse, urlunparse
 
 import requests
 
+from urllib3.util.retry import Retry
+
 from eidangservices import settings, utils
 from eidangservices.utils.schema import StreamEpochSchema
 from eidangservices.federator import __version__
 
 
-def _query_params_from_stream_epochs(stream_epochs):
-    serializer = StreamEpochSchema(many=True, context={'request': _GET})
+# NOTE(damb): A process-global session shares keep-alive connections among
+# all requests issued towards the same endpoint i.e. endpoint requests skip
+# the TCP/TLS handshake once a pooled connection is established. The session
+# is created lazily and guarded by the process id: forked worker processes
+# (e.g. combiner pools) inherit the parent's pooled sockets, and reusing
+# them from both sides of the fork would interleave writes on a single TCP
+# connection.
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
 
-    return utils.convert_sncl_dicts_to_query_params(
-        serializer.dump(stream_epochs))
+
+def _get_session():
+    """
+    Return the HTTP session of the current process, creating it on first
+    use and after a fork.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                for scheme in ('http://', 'https://'):
+                    # NOTE(damb): Retry connection establishment only; once
+                    # a request is on the wire retrying is left to the
+                    # application such that the client retry-budget
+                    # statistics remain valid.
+                    # pool_block caps the number of sockets opened towards
+                    # a single datacenter at pool_maxsize: surplus workers
+                    # wait for a pooled connection instead of tripping
+                    # server-side throttling.
+                    session.mount(scheme, requests.adapters.HTTPAdapter(
+                        pool_connections=(
+                            settings.EIDA_FEDERATOR_POOL_CONNECTIONS),
+                        pool_maxsize=settings.EIDA_FEDERATOR_POOL_MAXSIZE,
+                        pool_block=True,
+                        max_retries=Retry(
+                            total=None,
+                            connect=settings.EIDA_FEDERATOR_CONN_RETRIES,
+                            read=0, redirect=0, status=0,
+                            backoff_factor=(
+                                settings.EIDA_FEDERATOR_CONN_BACKOFF_FACTOR))))
+
+                _session = session
+                _session_pid = pid
+
+    return _session
 
 
 class _GET:
@@ -30,6 +78,37 @@ class _GET:
     method = 'GET'
 
 
+# NOTE(damb): Schema construction walks the declared fields via the
+# marshmallow metaclass; instantiate once and share - dumping is read-only
+# and hence thread-safe.
+_SE_GET_SCHEMA = StreamEpochSchema(many=True, context={'request': _GET})
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_url(url):
+    """
+    Parse ``url`` into scheme, netloc, sanitized path and the assembled
+    query URL. Memoized - granular strategies build one handler per route
+    against a handful of distinct endpoint URLs.
+    """
+    parsed = urlparse(url)
+    path = parsed.path.rstrip(
+        settings.FDSN_QUERY_METHOD_TOKEN).rstrip('/')
+    return (parsed.scheme, parsed.netloc, path,
+            urlunparse(
+                (parsed.scheme,
+                 parsed.netloc,
+                 '{}/{}'.format(path, settings.FDSN_QUERY_METHOD_TOKEN),
+                 '',
+                 '',
+                 '')))
+
+
+def _query_params_from_stream_epochs(stream_epochs):
+    return utils.convert_sncl_dicts_to_query_params(
+        _SE_GET_SCHEMA.dump(stream_epochs))
+
+
 # -----------------------------------------------------------------------------
 class RequestHandlerBase:
     """
@@ -53,27 +132,19 @@ class RequestHandlerBase:
 
         if isinstance(url, bytes):
             url = url.decode('utf-8')
-        url = urlparse(url)
-        self._scheme = url.scheme
-        self._netloc = url.netloc
-        self._path = url.path.rstrip(
-            settings.FDSN_QUERY_METHOD_TOKEN).rstrip('/')
+        self._scheme, self._netloc, self._path, self._url = _parse_url(url)
 
         self._query_params = query_params
         self._stream_epochs = stream_epochs
+        self._payload_post = None
+        self._payload_get = None
 
     @property
     def url(self):
         """
         Returns request URL without query parameters.
         """
-        return urlunparse(
-            (self._scheme,
-             self._netloc,
-             '{}/{}'.format(self._path, settings.FDSN_QUERY_METHOD_TOKEN),
-             '',
-             '',
-             ''))
+        return self._url
 
     @property
     def stream_epochs(self):
@@ -85,17 +156,23 @@ class RequestHandlerBase:
 
     @property
     def payload_post(self):
-        data = '\n'.join('{}={}'.format(p, v)
-                         for p, v in self._query_params.items())
-
-        return '{}\n{}'.format(
-            data, '\n'.join(str(se) for se in self._stream_epochs))
+        # NOTE(damb): Lazily serialized in a single pass and cached;
+        # the payload doubles as routing cache key i.e. it is accessed
+        # several times per request while parameters and stream epochs
+        # are fixed at construction time.
+        if self._payload_post is None:
+            self._payload_post = '\n'.join(chain(
+                ('{}={}'.format(p, v)
+                 for p, v in self._query_params.items()),
+                (str(se) for se in self._stream_epochs)))
+
+        return self._payload_post
 
     def get(self):
         raise NotImplementedError
 
     def post(self):
-        return functools.partial(requests.post, self.url,
+        return functools.partial(_get_session().post, self.url,
                                  data=self.payload_post, headers=self.HEADERS)
 
     def __str__(self):
@@ -116,12 +193,12 @@ class RoutingRequestHandler(RequestHandlerBase):
     Representation of a `eidaws-routing` (*StationLite*) request handler.
     """
 
-    QUERY_PARAMS = set(('service',
-                        'level',
-                        'minlatitude', 'minlat',
-                        'maxlatitude', 'maxlat',
-                        'minlongitude', 'minlon',
-                        'maxlongitude', 'maxlon'))
+    QUERY_PARAMS = frozenset(('service',
+                              'level',
+                              'minlatitude', 'minlat',
+                              'maxlatitude', 'maxlat',
+                              'minlongitude', 'minlon',
+                              'maxlongitude', 'maxlon'))
 
     def __init__(self, url, stream_epochs=[], query_params={}, **kwargs):
         """
@@ -131,27 +208,33 @@ class RoutingRequestHandler(RequestHandlerBase):
         requesting data from StationLite
         """
 
-        super().__init__(url, stream_epochs, query_params)
-
-        self._query_params = dict(
-            (p, v) for p, v in self._query_params.items()
+        # NOTE(damb): Filter once up-front instead of re-allocating the
+        # mapping assigned by the base class.
+        query_params = dict(
+            (p, v) for p, v in query_params.items()
             if p in self.QUERY_PARAMS)
 
-        self._query_params['format'] = 'post'
+        query_params['format'] = 'post'
 
         if 'proxy_netloc' in kwargs and kwargs['proxy_netloc'] is not None:
-            self._query_params['proxynetloc'] = kwargs['proxy_netloc']
+            query_params['proxynetloc'] = kwargs['proxy_netloc']
+
+        query_params['access'] = kwargs.get('access', 'any')
 
-        self._query_params['access'] = kwargs.get('access', 'any')
+        super().__init__(url, stream_epochs, query_params)
 
     @property
     def payload_get(self):
-        qp = deepcopy(self._query_params)
-        qp.update(_query_params_from_stream_epochs(self._stream_epochs))
-        return qp
+        # NOTE(damb): Analogously to payload_post serialized exactly once.
+        if self._payload_get is None:
+            qp = dict(self._query_params)
+            qp.update(_query_params_from_stream_epochs(self._stream_epochs))
+            self._payload_get = qp
+
+        return self._payload_get
 
     def get(self):
-        return functools.partial(requests.get, self.url,
+        return functools.partial(_get_session().get, self.url,
                                  params=self.payload_get, headers=self.HEADERS)
 
 
@@ -160,19 +243,19 @@ class FdsnRequestHandler(RequestHandlerBase):
     Representation of a FDSN webservice request handler.
     """
 
-    QUERY_PARAMS = set(('service',
-                        'nodata',
-                        'minlatitude', 'minlat',
-                        'maxlatitude', 'maxlat',
-                        'minlongitude', 'minlon',
-                        'maxlongitude', 'maxlon'))
+    QUERY_PARAMS = frozenset(('service',
+                              'nodata',
+                              'minlatitude', 'minlat',
+                              'maxlatitude', 'maxlat',
+                              'minlongitude', 'minlon',
+                              'maxlongitude', 'maxlon'))
 
     def __init__(self, url, stream_epochs=[], query_params={}):
-        super().__init__(url, stream_epochs=stream_epochs,
-                         query_params=query_params)
-        self._query_params = OrderedDict((p, v)
-                                  for p, v in self._query_params.items()
-                                  if p not in self.QUERY_PARAMS)
+        super().__init__(
+            url, stream_epochs=stream_epochs,
+            query_params=OrderedDict(
+                (p, v) for p, v in query_params.items()
+                if p not in self.QUERY_PARAMS))
 
 
 class GranularFdsnRequestHandler(FdsnRequestHandler):
@@ -185,20 +268,17 @@ class GranularFdsnRequestHandler(FdsnRequestHandler):
         super().__init__(url, stream_epochs=[stream_epoch],
                          query_params=query_params)
 
-    @property
-    def payload_post(self):
-        data = '\n'.join('{}={}'.format(p, v)
-                         for p, v in self._query_params.items())
-        return '{}\n{}'.format(data, self.stream_epochs[0])
-
     @property
     def payload_get(self):
-        qp = deepcopy(self._query_params)
-        qp.update(_query_params_from_stream_epochs(self._stream_epochs))
-        return qp
+        if self._payload_get is None:
+            qp = dict(self._query_params)
+            qp.update(_query_params_from_stream_epochs(self._stream_epochs))
+            self._payload_get = qp
+
+        return self._payload_get
 
     def get(self):
-        return functools.partial(requests.get, self.url,
+        return functools.partial(_get_session().get, self.url,
                                  params=self.payload_get, headers=self.HEADERS)
 
 
@@ -3,6 +3,7 @@
 Miscellaneous federator resources.
 """
 
+import functools
 import logging
 import os
 
@@ -14,6 +15,34 @@ from eidangservices.federator import __version__
 from eidangservices.utils import fdsnws
 
 
+@functools.lru_cache(maxsize=None)
+def _read_wadl(filename):
+    """
+    Return the memoized content of the WADL file ``filename``.
+
+    The WADL files shipped are static; reading them once saves the
+    filesystem round trip on every ``application.wadl`` request.
+    """
+    with open(os.path.join(settings.EIDA_FEDERATOR_APP_SHARE, filename),
+              'rb') as ifd:
+        return ifd.read()
+
+
+def get_wadl_response(filename):
+    """
+    Return :py:class:`flask.Response` object for the WADL file ``filename``
+    with correct mimetype.
+
+    :param str filename: WADL filename relative to the application share
+        directory
+    :rtype: :py:class:`flask.Response`
+    """
+
+    response = flask.make_response(_read_wadl(filename))
+    response.headers['Content-Type'] = settings.WADL_MIMETYPE
+    return response
+
+
 class MiscResource(Resource):
     """
     Base class for misc resources.
@@ -66,17 +95,11 @@ class DataselectWadlResource(MiscResource):
 
     @fdsnws.with_fdsnws_exception_handling(__version__)
     def get(self):
-        return flask.send_file(
-            os.path.join(settings.EIDA_FEDERATOR_APP_SHARE,
-                         settings.FDSN_DATASELECT_WADL_FILENAME),
-            mimetype=settings.WADL_MIMETYPE)
+        return get_wadl_response(settings.FDSN_DATASELECT_WADL_FILENAME)
 
     @fdsnws.with_fdsnws_exception_handling(__version__)
     def post(self):
-        return flask.send_file(
-            os.path.join(settings.EIDA_FEDERATOR_APP_SHARE,
-                         settings.FDSN_DATASELECT_WADL_FILENAME),
-            mimetype=settings.WADL_MIMETYPE)
+        return get_wadl_response(settings.FDSN_DATASELECT_WADL_FILENAME)
 
 
 class StationWadlResource(MiscResource):
@@ -84,17 +107,11 @@ class StationWadlResource(MiscResource):
 
     @fdsnws.with_fdsnws_exception_handling(__version__)
     def get(self):
-        return flask.send_file(
-            os.path.join(settings.EIDA_FEDERATOR_APP_SHARE,
-                         settings.FDSN_STATION_WADL_FILENAME),
-            mimetype=settings.WADL_MIMETYPE)
+        return get_wadl_response(settings.FDSN_STATION_WADL_FILENAME)
 
     @fdsnws.with_fdsnws_exception_handling(__version__)
     def post(self):
-        return flask.send_file(
-            os.path.join(settings.EIDA_FEDERATOR_APP_SHARE,
-                         settings.FDSN_STATION_WADL_FILENAME),
-            mimetype=settings.WADL_MIMETYPE)
+        return get_wadl_response(settings.FDSN_STATION_WADL_FILENAME)
 
 
 class WFCatalogWadlResource(MiscResource):
@@ -102,14 +119,8 @@ class WFCatalogWadlResource(MiscResource):
 
     @fdsnws.with_fdsnws_exception_handling(__version__)
     def get(self):
-        return flask.send_file(
-            os.path.join(settings.EIDA_FEDERATOR_APP_SHARE,
-                         settings.EIDA_WFCATALOG_WADL_FILENAME),
-            mimetype=settings.WADL_MIMETYPE)
+        return get_wadl_response(settings.EIDA_WFCATALOG_WADL_FILENAME)
 
     @fdsnws.with_fdsnws_exception_handling(__version__)
     def post(self):
-        return flask.send_file(
-            os.path.join(settings.EIDA_FEDERATOR_APP_SHARE,
-                         settings.EIDA_WFCATALOG_WADL_FILENAME),
-            mimetype=settings.WADL_MIMETYPE)
+        return get_wadl_response(settings.EIDA_WFCATALOG_WADL_FILENAME)
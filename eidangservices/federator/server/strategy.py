@@ -5,7 +5,11 @@ Facilities for route based requesting strategies.
 
 import collections
 import datetime
+import functools
 import logging
+import operator
+import threading
+import time
 
 from eidangservices import utils, settings
 from eidangservices.federator import __version__
@@ -15,16 +19,113 @@ from eidangservices.federator.server.mixin import ClientRetryBudgetMixin
 from eidangservices.federator.server.request import (
     GranularFdsnRequestHandler, BulkFdsnRequestHandler)
 from eidangservices.utils.httperrors import FDSNHTTPError
-from eidangservices.utils.request import (binary_request, RequestsError,
+from eidangservices.utils.request import (raw_request, RequestsError,
                                           NoContent)
 from eidangservices.utils.error import ErrorWithTraceback
 from eidangservices.utils.sncl import StreamEpoch
 
 
+# NOTE(damb): Routing tables are memoized for a short period of time
+# (shared among strategy instances within a worker). Identical federator
+# queries arriving within the TTL (e.g. web-UI re-requests, resubmitted
+# splits) thus skip the sequential round trip to the routing service.
+_routing_cache = {}
+_routing_cache_lock = threading.Lock()
+
+
+def _routing_cache_get(key):
+    with _routing_cache_lock:
+        entry = _routing_cache.get(key)
+        if entry is None:
+            return None
+
+        expires, routing_table = entry
+        if time.time() >= expires:
+            del _routing_cache[key]
+            return None
+
+        # NOTE(damb): Return a shallow copy since client retry-budget
+        # filtering modifies the table in-place.
+        return dict(routing_table)
+
+
+def _routing_cache_put(key, routing_table,
+                       ttl=settings.EIDA_FEDERATOR_ROUTING_CACHE_TTL):
+    if not ttl:
+        return
+
+    now = time.time()
+    with _routing_cache_lock:
+        if len(_routing_cache) >= settings.EIDA_FEDERATOR_ROUTING_CACHE_SIZE:
+            # evict expired entries; as a last resort start over
+            for k in [k for k, (expires, _) in _routing_cache.items()
+                      if now >= expires]:
+                del _routing_cache[k]
+            if (len(_routing_cache) >=
+                    settings.EIDA_FEDERATOR_ROUTING_CACHE_SIZE):
+                _routing_cache.clear()
+
+        _routing_cache[key] = (now + ttl, dict(routing_table))
+
+
+def _parse_routing_table(data, default_endtime=None):
+    """
+    Parse a routing service ``format=post`` response into a routing table.
+
+    :param bytes data: Raw routing service response
+    :param default_endtime: Default endtime substituted for stream epochs
+        with an undefined endtime
+    :rtype: dict
+    """
+    # NOTE(damb): Parse stanza-wise; bytes.split delimits in C instead of
+    # a readline state machine toggling per line. Line endings are
+    # normalized and surplus blank lines are tolerated i.e. stanzas do not
+    # vanish due to blank-line runs.
+    routing_table = {}
+    for stanza in data.replace(b'\r\n', b'\n').split(b'\n\n'):
+        lines = [line for line in
+                 (line.strip() for line in stanza.split(b'\n')) if line]
+        if not lines:
+            continue
+
+        stream_epochs = [
+            _stream_epoch_from_snclline(line, default_endtime)
+            for line in lines[1:]]
+
+        # set up the routing table
+        if stream_epochs:
+            routing_table[lines[0]] = stream_epochs
+
+    return routing_table
+
+
+def _substitute_default_endtime(routing_table, default_endtime):
+    """
+    Return a copy of ``routing_table`` with undefined stream epoch endtimes
+    substituted by ``default_endtime``.
+    """
+    return dict(
+        (url, [se if se.endtime is not None
+               else se._replace(endtime=default_endtime)
+               for se in stream_epochs])
+        for url, stream_epochs in routing_table.items())
+
+
+@functools.lru_cache(maxsize=65536)
+def _stream_epoch_from_snclline(line, default_endtime):
+    # NOTE(damb): StreamEpoch is an immutable namedtuple, hence cached
+    # instances are safely shared. The routing service returns plenty of
+    # repeated SNCL lines across endpoint stanzas and requests.
+    return StreamEpoch.from_snclline(line, default_endtime=default_endtime)
+
+
 def demux_routes(routing_table):
-    return [utils.Route(url, streams=[se])
+    # NOTE(damb): Lazily evaluated; consumers grouping or dispatching
+    # route-wise fuse with the generator instead of materializing an
+    # intermediate list.
+    return (utils.Route(url, streams=[se])
             for url, streams in routing_table.items()
-            for se in streams]
+            for se in streams)
 
 
 def group_routes_by(routing_table, key='network'):
@@ -38,23 +139,23 @@ def group_routes_by(routing_table, key='network'):
     """
     SEP = '.'
 
+    # NOTE(damb): Resolve the key function once instead of per route;
+    # attrgetter performs the attribute lookups in C.
+    fields = ['stream.{}'.format(f) for f in key.split(SEP)]
+    combined = len(fields) > 1
+    keyfn = operator.attrgetter(*fields)
+
     routes = demux_routes(routing_table)
     retval = collections.defaultdict(list)
 
     for route in routes:
         try:
-            _key = getattr(route.streams[0].stream, key)
-        except AttributeError:
-            try:
-                if SEP in key:
-                    # combined key
-                    _key = SEP.join(getattr(route.streams[0].stream, k)
-                                    for k in key.split(SEP))
-                else:
-                    raise KeyError(
-                        'Invalid separator. Must be {!r}.'.format(SEP))
-            except (AttributeError, KeyError) as err:
-                raise RequestStrategyError(err)
+            _key = keyfn(route.streams[0])
+        except AttributeError as err:
+            raise RequestStrategyError(err)
+
+        if combined:
+            _key = SEP.join(_key)
 
         retval[_key].append(route)
 
@@ -140,38 +241,28 @@ class RequestStrategyBase(ClientRetryBudgetMixin):
 
         _req = (req.post() if post else req.get())
 
+        cache_key = (req.url, req.payload_post if post
+                     else tuple(sorted(req.payload_get.items())))
+        routing_table = _routing_cache_get(cache_key)
+        if routing_table is not None:
+            self.logger.debug(
+                'Routing table cache hit (number of routes: {}).'.format(
+                    len(routing_table)))
+            return (_substitute_default_endtime(
+                routing_table, self._default_endtime)
+                if post else routing_table)
+
         routing_table = {}
         self.logger.info("Fetching routes from %s" % req.url)
         try:
-            with binary_request(_req) as fd:
-                # parse the routing service's output stream; create a routing
-                # table
-                urlline = None
-                stream_epochs = []
-
-                while True:
-                    line = fd.readline()
-
-                    if not urlline:
-                        urlline = line.strip()
-                    elif not line.strip():
-                        # set up the routing table
-                        if stream_epochs:
-                            routing_table[urlline] = stream_epochs
-
-                        urlline = None
-                        stream_epochs = []
-
-                        if not line:
-                            break
-                    else:
-                        # XXX(damb): Do not substitute an empty endtime when
-                        # performing HTTP GET requests in order to guarantee
-                        # more cache hits (if eida-federator is coupled with
-                        # HTTP caching proxy).
-                        stream_epochs.append(
-                            StreamEpoch.from_snclline(line, default_endtime=(
-                                self._default_endtime if post else None)))
+            with raw_request(_req) as fd:
+                # NOTE(damb): Read the streamed response in one go;
+                # raw_request avoids binary_request's intermediate BytesIO
+                # copy. decode_content must be requested explicitly -
+                # raw reads return the undecoded (e.g. gzipped) body
+                # otherwise.
+                routing_table = _parse_routing_table(
+                    fd.read(decode_content=True))
 
         except NoContent as err:
             self.logger.warning(err)
@@ -185,6 +276,17 @@ class RequestStrategyBase(ClientRetryBudgetMixin):
         else:
             self.logger.debug(
                 'Number of routes received: {}'.format(len(routing_table)))
+            # NOTE(damb): The table is memoized with undefined endtimes
+            # left untouched; the request specific default endtime is
+            # substituted below i.e. also on cache hits.
+            _routing_cache_put(cache_key, routing_table)
+
+        # XXX(damb): Do not substitute an empty endtime when performing
+        # HTTP GET requests in order to guarantee more cache hits (if
+        # eida-federator is coupled with HTTP caching proxy).
+        if post:
+            routing_table = _substitute_default_endtime(
+                routing_table, self._default_endtime)
 
         return routing_table
 
@@ -217,6 +319,11 @@ class RequestStrategyBase(ClientRetryBudgetMixin):
         :param dict tasks: Mapping of concrete tasks.
         :param dict query_params: Query parameters
 
+        :param callback: Callable invoked with the task's result once the
+            task completed (optional)
+        :param error_callback: Callable invoked with the exception in case
+            the task raised (optional)
+
         :returns: Asynchronous task results
         """
 
@@ -276,7 +383,7 @@ class GranularRequestStrategy(RequestStrategyBase):
         self._filter_by_client_retry_budget(routing_table, retry_budget_client)
         self._routing_table_raw = routing_table
 
-        self._routes = demux_routes(routing_table)
+        self._routes = list(demux_routes(routing_table))
 
         return len(self._routes)
 
@@ -288,6 +395,8 @@ class GranularRequestStrategy(RequestStrategyBase):
         assert hasattr(self, '_routes'), 'Missing routes.'
 
         default_task = self._get_task_by_kw(tasks, 'default')
+        callback = kwargs.pop('callback', None)
+        error_callback = kwargs.pop('error_callback', None)
 
         retval = []
         for route in self._routes:
@@ -302,7 +411,8 @@ class GranularRequestStrategy(RequestStrategyBase):
                     query_params=query_params),
                 context=ctx,
                 **kwargs)
-            result = pool.apply_async(t)
+            result = pool.apply_async(t, callback=callback,
+                                      error_callback=error_callback)
             retval.append(result)
 
         return retval
@@ -338,6 +448,8 @@ class NetworkBulkRequestStrategy(RequestStrategyBase):
         assert hasattr(self, '_routes'), 'Missing routes.'
 
         default_task = self._get_task_by_kw(tasks, 'default')
+        callback = kwargs.pop('callback', None)
+        error_callback = kwargs.pop('error_callback', None)
 
         http_method = kwargs.pop(
             'http_method',
@@ -366,7 +478,8 @@ class NetworkBulkRequestStrategy(RequestStrategyBase):
                         stream_epochs=bulk_route.streams,
                         query_params=query_params),
                     context=ctx, http_method='POST', **kwargs)
-                result = pool.apply_async(t)
+                result = pool.apply_async(
+                    t, callback=callback, error_callback=error_callback)
                 retval.append(result)
 
         return retval
@@ -409,6 +522,8 @@ class AdaptiveNetworkBulkRequestStrategy(NetworkBulkRequestStrategy):
 
         default_task = self._get_task_by_kw(tasks, 'default')
         combining_task = self._get_task_by_kw(tasks, 'combining')
+        callback = kwargs.pop('callback', None)
+        error_callback = kwargs.pop('error_callback', None)
 
         http_method = kwargs.pop(
             'http_method',
@@ -446,7 +561,8 @@ class AdaptiveNetworkBulkRequestStrategy(NetworkBulkRequestStrategy):
             else:
                 raise RoutingError('Missing routes.')
 
-            result = pool.apply_async(t)
+            result = pool.apply_async(t, callback=callback,
+                                      error_callback=error_callback)
             retval.append(result)
 
         return retval
@@ -474,6 +590,8 @@ class NetworkCombiningRequestStrategy(RequestStrategyBase):
         assert hasattr(self, '_routes'), 'Missing routes.'
 
         combining_task = self._get_task_by_kw(tasks, 'combining')
+        callback = kwargs.pop('callback', None)
+        error_callback = kwargs.pop('error_callback', None)
 
         retval = []
         for net, routes in self._routes.items():
@@ -483,7 +601,8 @@ class NetworkCombiningRequestStrategy(RequestStrategyBase):
                 'Creating {!r} for net={!r} ...'.format(combining_task, net))
             t = combining_task(
                 routes, query_params, name=net, context=ctx, **kwargs)
-            result = pool.apply_async(t)
+            result = pool.apply_async(t, callback=callback,
+                                      error_callback=error_callback)
             retval.append(result)
 
         return retval
@@ -10,6 +10,8 @@ import json
 import logging
 import os
 
+import multiprocessing as mp
+
 from multiprocessing.pool import ThreadPool
 
 import ijson
@@ -22,8 +24,8 @@ from eidangservices.federator.server.misc import (
     elements_equal)
 from eidangservices.federator.server.mixin import ClientRetryBudgetMixin
 from eidangservices.federator.server.request import GranularFdsnRequestHandler
-from eidangservices.utils.request import (binary_request, raw_request,
-                                          stream_request, RequestsError)
+from eidangservices.utils.request import (raw_request, stream_request,
+                                          RequestsError)
 from eidangservices.utils.error import Error, ErrorWithTraceback
 
 
@@ -120,6 +122,14 @@ def with_client_retry_budget_validation(func):
     return decorator
 
 
+def _apply_task(task):
+    """
+    Utility function invoking ``task``; :py:meth:`Pool.imap_unordered`
+    requires a callable operating on the iterable's items.
+    """
+    return task()
+
+
 # -----------------------------------------------------------------------------
 class Result(collections.namedtuple('Result', ['status',
                                                'status_code',
@@ -271,12 +281,24 @@ class CombinerTask(TaskBase):
             kwargs.get('pool_size', self.MAX_THREADS_DOWNLOADING))
         self._pool = None
 
-        self._results = []
+        self._result_iter = None
         self._sizes = []
 
     def _handle_error(self, err):
         self.logger.warning(str(err))
 
+    def _clean(self, result):
+        self.logger.debug(
+            'Removing temporary file {!r} ...'.format(
+                result.data))
+        if (result.data and
+            self._keep_tempfiles not in (KeepTempfiles.ALL,
+                                         KeepTempfiles.ON_ERRORS)):
+            try:
+                os.remove(result.data)
+            except OSError:
+                pass
+
     def _terminate(self):
         """
         Terminate the combiner.
@@ -291,15 +313,15 @@ class CombinerTask(TaskBase):
         self._pool.terminate()
         self._pool.join()
 
-        if (self._keep_tempfiles not in (KeepTempfiles.ALL,
-                                         KeepTempfiles.ON_ERRORS)):
-            for result in self._results:
-                if result.ready():
-                    _result = result.get()
-                    try:
-                        os.remove(_result.data)
-                    except OSError:
-                        pass
+        if self._result_iter is not None:
+            # NOTE(damb): Remove temporary files of tasks having completed
+            # by now - including those which finished while the pool was
+            # shutting down.
+            while True:
+                try:
+                    self._clean(self._result_iter.next(timeout=0))
+                except (mp.TimeoutError, StopIteration):
+                    break
 
         self._pool = None
 
@@ -343,6 +365,8 @@ class StationXMLNetworkCombinerTask(CombinerTask):
     LOGGER = 'flask.app.federator.task_combiner_stationxml'
 
     POOL_SIZE = 5
+    # timeout in seconds between context checks while downloads are pending
+    TIMEOUT_NEXT_RESULT = 0.5
 
     NETWORK_TAG = settings.STATIONXML_ELEMENT_NETWORK
     STATION_TAG = settings.STATIONXML_ELEMENT_STATION
@@ -364,18 +388,6 @@ class StationXMLNetworkCombinerTask(CombinerTask):
         self._network_elements = []
         self.path_tempfile = None
 
-    def _clean(self, result):
-        self.logger.debug(
-            'Removing temporary file {!r} ...'.format(
-                result.data))
-        if (result.data and
-            self._keep_tempfiles not in (KeepTempfiles.ALL,
-                                         KeepTempfiles.ON_ERRORS)):
-            try:
-                os.remove(result.data)
-            except OSError:
-                pass
-
     def _run(self):
         """
         Combine `StationXML <http://www.fdsn.org/xml/station/>`_
@@ -384,110 +396,109 @@ class StationXMLNetworkCombinerTask(CombinerTask):
         self.logger.info('Executing task {!r} ...'.format(self))
         self._pool = ThreadPool(processes=self._num_workers)
 
+        tasks = []
         for route in self._routes:
             self.logger.debug(
                 'Creating DownloadTask for route {!r} ...'.format(route))
             ctx = Context()
             self._ctx.append(ctx)
 
-            t = RawDownloadTask(
-                GranularFdsnRequestHandler(
-                    route.url,
-                    route.streams[0],
-                    query_params=self.query_params),
-                decode_unicode=True,
-                context=ctx,
-                keep_tempfiles=self._keep_tempfiles,
-                http_method=self._http_method)
+            tasks.append(
+                RawDownloadTask(
+                    GranularFdsnRequestHandler(
+                        route.url,
+                        route.streams[0],
+                        query_params=self.query_params),
+                    decode_unicode=True,
+                    context=ctx,
+                    keep_tempfiles=self._keep_tempfiles,
+                    http_method=self._http_method))
+
+        # NOTE(damb): imap_unordered hands results over in completion
+        # order; the timeout'ed next() allows checking the context while
+        # downloads are pending.
+        result_iter = self._result_iter = self._pool.imap_unordered(
+            _apply_task, tasks)
+        self._pool.close()
 
-            # apply DownloadTask asynchronoulsy to the worker pool
-            result = self._pool.apply_async(t)
+        outstanding = len(tasks)
+        while outstanding:
+            try:
+                _result = result_iter.next(timeout=self.TIMEOUT_NEXT_RESULT)
+            except mp.TimeoutError:
+                _result = None
+            else:
+                outstanding -= 1
+                if _result.status_code == 200:
+                    if self._level in ('channel', 'response'):
+                        # merge <Channel></Channel> elements into
+                        # <Station></Station> from the correct
+                        # <Network></Network> epoch element
+                        for _net_element in self._extract_net_elements(
+                                _result.data):
+
+                            # find the correct <Network></Network> epoch
+                            # element
+                            net_element, known = self._emerge_net_element(
+                                _net_element,
+                                exclude_tags=[
+                                    '{}{}'.format(ns, self.STATION_TAG)
+                                    for ns in
+                                    settings.STATIONXML_NAMESPACES])
+
+                            if not known:
+                                continue
 
-            self._results.append(result)
+                            # append/merge station elements
+                            for sta_element in \
+                                    self._emerge_sta_elements(
+                                        _net_element):
+                                self._merge_sta_element(
+                                    net_element,
+                                    sta_element)
+
+                    elif self._level == 'station':
+                        # append <Station></Station> elements to the
+                        # corresponding <Network></Network> epoch
+                        for _net_element in self._extract_net_elements(
+                                _result.data):
+
+                            net_element, known = self._emerge_net_element(
+                                _net_element,
+                                exclude_tags=[
+                                    '{}{}'.format(ns, self.STATION_TAG)
+                                    for ns in
+                                    settings.STATIONXML_NAMESPACES])
+
+                            if not known:
+                                continue
 
-        self._pool.close()
+                            # append station elements
+                            # NOTE(damb): <Station></Station> elements
+                            # defined by multiple EIDA nodes are simply
+                            # appended; no merging is performed
+                            for sta_element in \
+                                    self._emerge_sta_elements(
+                                        _net_element):
+                                net_element.append(sta_element)
 
-        # fetch results ready
-        while True:
-            ready = []
-            for result in self._results:
-                if result.ready():
-                    _result = result.get()
-                    if _result.status_code == 200:
-                        if self._level in ('channel', 'response'):
-                            # merge <Channel></Channel> elements into
-                            # <Station></Station> from the correct
-                            # <Network></Network> epoch element
-                            for _net_element in self._extract_net_elements(
-                                    _result.data):
-
-                                # find the correct <Network></Network> epoch
-                                # element
-                                net_element, known = self._emerge_net_element(
-                                    _net_element,
-                                    exclude_tags=[
-                                        '{}{}'.format(ns, self.STATION_TAG)
-                                        for ns in
-                                        settings.STATIONXML_NAMESPACES])
-
-                                if not known:
-                                    continue
-
-                                # append/merge station elements
-                                for sta_element in \
-                                        self._emerge_sta_elements(
-                                            _net_element):
-                                    self._merge_sta_element(
-                                        net_element,
-                                        sta_element)
-
-                        elif self._level == 'station':
-                            # append <Station></Station> elements to the
-                            # corresponding <Network></Network> epoch
-                            for _net_element in self._extract_net_elements(
-                                    _result.data):
-
-                                net_element, known = self._emerge_net_element(
-                                    _net_element,
-                                    exclude_tags=[
-                                        '{}{}'.format(ns, self.STATION_TAG)
-                                        for ns in
-                                        settings.STATIONXML_NAMESPACES])
-
-                                if not known:
-                                    continue
-
-                                # append station elements
-                                # NOTE(damb): <Station></Station> elements
-                                # defined by multiple EIDA nodes are simply
-                                # appended; no merging is performed
-                                for sta_element in \
-                                        self._emerge_sta_elements(
-                                            _net_element):
-                                    net_element.append(sta_element)
-
-                        elif self._level == 'network':
-                            for net_element in self._extract_net_elements(
-                                    _result.data):
-                                _, _ = self._emerge_net_element(net_element)
-
-                        self._clean(_result)
-                        self._sizes.append(_result.length)
-
-                    else:
-                        self._handle_error(_result)
-                        self._sizes.append(0)
-
-                    ready.append(result)
-
-            for result in ready:
-                self._results.remove(result)
-
-            if not self._results:
-                break
+                    elif self._level == 'network':
+                        for net_element in self._extract_net_elements(
+                                _result.data):
+                            _, _ = self._emerge_net_element(net_element)
 
-            if self._has_inactive_ctx():
+                    self._clean(_result)
+                    self._sizes.append(_result.length)
+
+                else:
+                    self._handle_error(_result)
+                    self._sizes.append(0)
+
+            if outstanding and self._has_inactive_ctx():
                 self.logger.debug('{}: Closing ...'.format(self.name))
+                # NOTE(damb): _terminate drains the result iterator i.e.
+                # temporary files of tasks completing during the shutdown
+                # are removed, too.
                 self._terminate()
                 raise self.MissingContextLock
 
@@ -828,6 +839,9 @@ class WFCatalogSplitAndAlignTask(SplitAndAlignTask):
             try:
                 with open(self.path_tempfile, 'ab') as ofd:
                     with raw_request(req, logger=self.logger) as ifd:
+                        # XXX(damb): Decode explicitly; raw reads return
+                        # the undecoded (e.g. gzipped) body otherwise.
+                        ifd.decode_content = True
 
                         if self._last_obj is None:
                             ofd.write(self.JSON_LIST_START)
@@ -1016,9 +1030,12 @@ class StationTextDownloadTask(RawDownloadTask):
         """
 
         with open(self.path_tempfile, 'wb') as ofd:
-            # NOTE(damb): For granular fdnsws-station-text request it seems
-            # ok buffering the entire response in memory.
-            with binary_request(req, logger=self.logger) as ifd:
+            # NOTE(damb): Process the streamed response line-wise i.e.
+            # without buffering the entire response in memory.
+            with raw_request(req, logger=self.logger) as ifd:
+                # XXX(damb): Decode explicitly; raw reads return the
+                # undecoded (e.g. gzipped) body otherwise.
+                ifd.decode_content = True
                 for line in ifd:
                     self._size += len(line)
                     if line.startswith(b'#'):
@@ -1052,8 +1069,12 @@ class StationXMLDownloadTask(RawDownloadTask):
         Extracts ``Network`` elements from StationXML.
         """
         with open(self.path_tempfile, 'wb') as ofd:
-            # XXX(damb): Load the entire result into memory.
-            with binary_request(req, logger=self.logger) as ifd:
+            # NOTE(damb): The SAX parser consumes the streamed response;
+            # network I/O overlaps with parsing/extraction.
+            with raw_request(req, logger=self.logger) as ifd:
+                # XXX(damb): Decode explicitly; raw reads return the
+                # undecoded (e.g. gzipped) body otherwise.
+                ifd.decode_content = True
                 for event, net_element in etree.iterparse(
                         ifd, tag=self._network_tags):
                     if event == 'end':
@@ -5,12 +5,140 @@ Federator misc related test facilities.
 
 import copy
 import io
+import threading
 import unittest
 
+import redis
+
 from lxml import etree
 
 from eidangservices import settings
-from eidangservices.federator.server.misc import elements_equal
+from eidangservices.federator.server.misc import (
+    RequestSlot, RequestSlotPool, elements_equal)
+
+
+# -----------------------------------------------------------------------------
+class RequestSlotTestCase(unittest.TestCase):
+
+    def test_acquire_release(self):
+        slot = RequestSlot()
+
+        self.assertTrue(slot.acquire(timeout=0.1))
+        slot.release()
+        self.assertTrue(slot.acquire(timeout=0.1))
+
+    def test_acquire_timeout(self):
+        slot = RequestSlot()
+
+        self.assertTrue(slot.acquire(timeout=0.1))
+        self.assertFalse(slot.acquire(timeout=0.1))
+
+    def test_acquire_within_limit(self):
+        slot = RequestSlot(limit=2)
+
+        self.assertTrue(slot.acquire(timeout=0.1))
+        self.assertTrue(slot.acquire(timeout=0.1))
+        self.assertEqual(slot.in_flight, 2)
+        self.assertFalse(slot.acquire(timeout=0.1))
+
+        slot.release()
+        self.assertEqual(slot.in_flight, 1)
+
+    def test_acquire_blocking(self):
+        slot = RequestSlot()
+        self.assertTrue(slot.acquire(timeout=0.1))
+
+        t = threading.Timer(0.05, slot.release)
+        t.start()
+        try:
+            self.assertTrue(slot.acquire(timeout=5))
+        finally:
+            t.cancel()
+
+
+# -----------------------------------------------------------------------------
+class RequestSlotPoolTestCase(unittest.TestCase):
+
+    db = 15
+    url = 'http://www.example.com/fdsnws/station/1/query'
+
+    def setUp(self):
+        # requires a Redis instance serving at redis://localhost:6379/
+        self.redis = redis.StrictRedis(db=self.db)
+
+        try:
+            if self.redis.dbsize():
+                raise EnvironmentError(
+                    'Redis database number %d is not empty, tests could harm '
+                    'your data.' % self.db)
+        except redis.exceptions.ConnectionError as err:
+            raise unittest.SkipTest(err)
+
+    def tearDown(self):
+        self.redis.flushdb()
+
+    def create_pool(self, **kwargs):
+        return RequestSlotPool(self.redis, **kwargs)
+
+    def test_acquire_release(self):
+        pool = self.create_pool()
+        pool.init_pool(self.url, limit=1)
+
+        req_id = pool.acquire(self.url, timeout=0.1)
+        self.assertIsNotNone(req_id)
+        # pool exhausted
+        self.assertIsNone(pool.acquire(self.url, timeout=0.1))
+
+        pool.release(self.url, req_id)
+        self.assertIsNotNone(pool.acquire(self.url, timeout=0.1))
+
+    def test_acquire_within_limit(self):
+        pool = self.create_pool()
+        pool.init_pool(self.url, limit=2)
+
+        self.assertIsNotNone(pool.acquire(self.url, timeout=0.1))
+        self.assertIsNotNone(pool.acquire(self.url, timeout=0.1))
+        self.assertIsNone(pool.acquire(self.url, timeout=0.1))
+
+    def test_acquire_gc_stale(self):
+        pool = self.create_pool(stale_ttl=0.1)
+        pool.init_pool(self.url, limit=1)
+
+        self.assertIsNotNone(pool.acquire(self.url, timeout=0.1))
+        # slot never released; garbage collected while acquiring
+        self.assertIsNotNone(pool.acquire(self.url, timeout=0.5))
+
+    def test_release_drain(self):
+        pool = self.create_pool()
+        pool.init_pool(self.url, limit=1)
+
+        req_id = pool.acquire(self.url, timeout=0.1)
+        pool.release(self.url, req_id)
+        # token cached worker-locally
+        self.assertEqual(
+            self.redis.llen(RequestSlotPool.KEY_PREFIX_FREE + self.url), 0)
+
+        pool.drain()
+        self.assertEqual(
+            self.redis.llen(RequestSlotPool.KEY_PREFIX_FREE + self.url), 1)
+
+    def test_acquire_unregistered(self):
+        pool = self.create_pool()
+
+        with self.assertRaises(RequestSlotPool.PoolError):
+            pool.acquire(self.url, timeout=0.1)
+
+    def test_slot_contextmanager(self):
+        pool = self.create_pool()
+        pool.init_pool(self.url, limit=1)
+
+        with pool.slot(self.url, timeout=0.1):
+            with self.assertRaises(RequestSlotPool.Timeout):
+                with pool.slot(self.url, timeout=0.1):
+                    pass
+
+        # slot released on context exit
+        self.assertIsNotNone(pool.acquire(self.url, timeout=0.1))
 
 
 # -----------------------------------------------------------------------------
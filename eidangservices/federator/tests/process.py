@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Federator processing related test facilities.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import tempfile
+import unittest
+
+from eidangservices.federator.server.misc import KeepTempfiles
+from eidangservices.federator.server.process import (
+    StationTextRequestProcessor)
+from eidangservices.federator.server.task import Result
+
+
+# -----------------------------------------------------------------------------
+class StationTextRequestProcessorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path_tempfile = None
+
+    def tearDown(self):
+        if self.path_tempfile is not None:
+            try:
+                os.remove(self.path_tempfile)
+            except OSError:
+                pass
+
+    @staticmethod
+    def create_processor(level='network'):
+        # NOTE(damb): Constructing the processor requires an application
+        # context; instead create a bare instance equipped with the
+        # attributes streaming relies on.
+        processor = StationTextRequestProcessor.__new__(
+            StationTextRequestProcessor)
+        processor.logger = logging.getLogger(
+            StationTextRequestProcessor.LOGGER)
+        processor._completion_queue = queue.Queue()
+        processor._outstanding = 0
+        processor._sizes = []
+        processor._keep_tempfiles = KeepTempfiles.NONE
+        processor._pool = mp.pool.ThreadPool(processes=1)
+        processor._pool.close()
+        processor._level = level
+
+        return processor
+
+    def create_tempfile(self, data):
+        with tempfile.NamedTemporaryFile(
+                mode='w', encoding='utf-8', delete=False) as ofd:
+            ofd.write(data)
+            self.path_tempfile = ofd.name
+
+        return ofd.name
+
+    def test_stream_with_header(self):
+        data = 'Z3|AlpArray|2015-01-01T00:00:00|2020-07-01T00:00:00|306\n'
+        path_tempfile = self.create_tempfile(data)
+
+        processor = self.create_processor(level='network')
+        processor._completion_queue.put(
+            Result.ok(data=path_tempfile, length=len(data)))
+        processor._outstanding = 1
+
+        self.assertEqual(
+            ''.join(processor),
+            '{}\n{}'.format(
+                StationTextRequestProcessor.HEADER_NETWORK, data))
+
+    def test_stream_single_header(self):
+        data = 'Z3|AlpArray|2015-01-01T00:00:00|2020-07-01T00:00:00|306\n'
+        paths_tempfile = [self.create_tempfile(data) for _ in range(2)]
+
+        processor = self.create_processor(level='network')
+        for p in paths_tempfile:
+            processor._completion_queue.put(
+                Result.ok(data=p, length=len(data)))
+        processor._outstanding = 2
+
+        self.assertEqual(
+            ''.join(processor),
+            '{}\n{}{}'.format(
+                StationTextRequestProcessor.HEADER_NETWORK, data, data))
+
+
+# -----------------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Federator request strategy related test facilities.
+"""
+
+import unittest
+
+from eidangservices.federator.server.strategy import _parse_routing_table
+from eidangservices.utils.sncl import StreamEpoch
+
+
+# -----------------------------------------------------------------------------
+class RoutingTableParserTestCase(unittest.TestCase):
+
+    url = b'http://eida.ethz.ch/fdsnws/station/1/query'
+    url_other = b'http://geofon.gfz-potsdam.de/fdsnws/station/1/query'
+    snclline = b'CH DAVOX -- HHZ 2017-01-01T00:00:00 2017-01-02T00:00:00'
+    snclline_other = (
+        b'GE DAG -- BHZ 2017-01-01T00:00:00 2017-01-02T00:00:00')
+
+    def test_single_stanza(self):
+        data = self.url + b'\n' + self.snclline
+
+        self.assertEqual(
+            _parse_routing_table(data),
+            {self.url: [StreamEpoch.from_snclline(self.snclline)]})
+
+    def test_multiple_stanzas(self):
+        data = (self.url + b'\n' + self.snclline + b'\n\n' +
+                self.url_other + b'\n' + self.snclline_other)
+
+        self.assertEqual(
+            _parse_routing_table(data),
+            {self.url: [StreamEpoch.from_snclline(self.snclline)],
+             self.url_other:
+                 [StreamEpoch.from_snclline(self.snclline_other)]})
+
+    def test_blank_line_run(self):
+        data = (self.url + b'\n' + self.snclline + b'\n\n\n' +
+                self.url_other + b'\n' + self.snclline_other)
+
+        self.assertEqual(
+            _parse_routing_table(data),
+            {self.url: [StreamEpoch.from_snclline(self.snclline)],
+             self.url_other:
+                 [StreamEpoch.from_snclline(self.snclline_other)]})
+
+    def test_crlf_line_endings(self):
+        data = (self.url + b'\r\n' + self.snclline + b'\r\n\r\n' +
+                self.url_other + b'\r\n' + self.snclline_other + b'\r\n')
+
+        self.assertEqual(
+            _parse_routing_table(data),
+            {self.url: [StreamEpoch.from_snclline(self.snclline)],
+             self.url_other:
+                 [StreamEpoch.from_snclline(self.snclline_other)]})
+
+    def test_trailing_newlines(self):
+        data = self.url + b'\n' + self.snclline + b'\n\n'
+
+        self.assertEqual(
+            _parse_routing_table(data),
+            {self.url: [StreamEpoch.from_snclline(self.snclline)]})
+
+    def test_empty(self):
+        self.assertEqual(_parse_routing_table(b''), {})
+
+
+# -----------------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -567,6 +567,19 @@ EIDA_FEDERATOR_STREAMING_TIMEOUT = 600
 EIDA_FEDERATOR_ENDPOINT_TIMEOUT = 540
 # timeout in seconds allowing processors a graceful shutdown
 EIDA_FEDERATOR_SHUTDOWN_TIMEOUT = 30
+# TTL in seconds routing tables are memoized with; 0 disables caching
+EIDA_FEDERATOR_ROUTING_CACHE_TTL = 300
+# maximum number of routing tables memoized
+EIDA_FEDERATOR_ROUTING_CACHE_SIZE = 1024
+# number of host-specific connection pools kept by the shared HTTP session
+EIDA_FEDERATOR_POOL_CONNECTIONS = 10
+# maximum number of keep-alive connections per host-specific pool
+EIDA_FEDERATOR_POOL_MAXSIZE = 10
+# number of connection establishment retries performed by the shared HTTP
+# session
+EIDA_FEDERATOR_CONN_RETRIES = 3
+# backoff factor in seconds applied between connection establishment retries
+EIDA_FEDERATOR_CONN_BACKOFF_FACTOR = 0.3
 
 # number of federator-dataselect download threads
 EIDA_FEDERATOR_THREADS_DATASELECT = 10